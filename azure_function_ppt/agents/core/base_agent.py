@@ -3,6 +3,8 @@ Base Agent Class for PowerPoint Service
 """
 from semantic_kernel.contents import ChatMessageContent, AuthorRole
 
+_MISSING = object()
+
 class BaseAgent:
     """Base class for all PowerPoint generation agents"""
     
@@ -21,6 +23,21 @@ class BaseAgent:
         message = ChatMessageContent(role=AuthorRole.ASSISTANT, content=content)
         self.conversation_history.append(message)
 
+    @staticmethod
+    def get_response_text(response) -> str:
+        """Text of a semantic kernel agent response - str results pass through without copying"""
+        if isinstance(response, str):
+            return response
+        # New format: AgentResponseItem with message attribute
+        message = getattr(response, 'message', _MISSING)
+        if message is _MISSING:
+            # Old format: list of messages
+            if not (isinstance(response, list) and response):
+                return str(response)
+            message = response[-1]
+        content = getattr(message, 'content', message)
+        return content if isinstance(content, str) else str(content)
+
     def get_conversation_history(self):
         """Get current conversation history"""
         return self.conversation_history.copy()
@@ -0,0 +1,47 @@
+"""
+Markdown slide parser for the PowerPoint Builder
+
+Kept free of python-pptx and agent imports, with full type annotations, so it can be
+compiled with mypyc (`mypyc agents/core/markdown_parser.py`). Python picks up the
+compiled extension over this file automatically when it is present.
+"""
+import re
+from typing import List, Optional
+from agents.core.slide_info import SlideInfo
+
+# Non-blank markdown slide line: optional "#"/"##" heading or "-"/"*" bullet marker, then the text.
+# Scanned over the whole document with MULTILINE, so blank lines never match.
+# Unmatched heading group comes back as '' from findall.
+# Surrounding whitespace is any whitespace but newline, like str.strip() - PDF/DOCX text often leads with NBSP.
+_MD_LINE = re.compile(r'^[^\S\n]*(?:(#{1,2})[ \t]+|[-*][ \t]+)?(\S.*?)[^\S\n]*$', re.MULTILINE)
+
+def parse_markdown_content(content: str) -> List[SlideInfo]:
+    """Parse markdown-style slide content"""
+    slides: List[SlideInfo] = []
+    current_slide: Optional[SlideInfo] = None
+
+    # findall hands back plain (heading, text) tuples - cheaper than match objects + group() calls
+    for heading, text in _MD_LINE.findall(content):
+        if heading:
+            if current_slide:
+                slides.append(current_slide)
+            current_slide = SlideInfo(
+                title=text,
+                content=[],
+                slide_type="TITLE_SLIDE" if not slides else "CONTENT_SLIDE"
+            )
+        elif current_slide:
+            # Bullet markers are already stripped by the regex
+            current_slide.content.append(text)
+
+    if current_slide:
+        slides.append(current_slide)
+
+    if not slides:
+        slides = [SlideInfo(
+            title="Generated Presentation",
+            content=["Content extracted from document"],
+            slide_type="TITLE_SLIDE"
+        )]
+
+    return slides
@@ -0,0 +1,47 @@
+"""
+In-memory cache for validated AI agent responses
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+class ResponseCache:
+    """LRU + TTL cache of agent responses - lives for the lifetime of the Function worker"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries    # 0 disables caching
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """SHA-256 over the request parts - keys stay small however large the document is"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\x00")  # Separator so ("ab", "c") and ("a", "bc") differ
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for key, or None when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: str):
+        """Store a response, evicting the least recently used entries past max_entries"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,28 @@
+"""
+Slide record used by the PowerPoint Builder
+"""
+from dataclasses import dataclass
+from typing import Any
+
+@dataclass
+class SlideInfo:
+    """Normalized slide - one per slide the builder creates"""
+    __slots__ = ("title", "content", "slide_type")
+
+    title: Any
+    content: Any        # List of items, or a falsy value when the slide has no content
+    slide_type: str
+
+    @classmethod
+    def from_dict(cls, slide_data: dict) -> "SlideInfo":
+        """Build from an AI-generated slide dict (detailed content or structure outline)"""
+        # Content can come from either "content" (detailed) or "content_outline" (structure)
+        content = slide_data.get("content") or slide_data.get("content_outline", [])
+        # Wrap single values so slide formatters can always assume a list
+        if content and not isinstance(content, list):
+            content = [content]
+        return cls(
+            title=slide_data.get("title", "Slide Title"),
+            content=content,
+            slide_type=slide_data.get("slide_type") or slide_data.get("layout", "CONTENT_SLIDE"),
+        )
@@ -4,14 +4,102 @@ PowerPoint Builder Agent - With template support
 from pptx import Presentation
 from pptx.util import Pt, Inches
 from pptx.dml.color import RGBColor
-from pptx.enum.text import PP_ALIGN
-from typing import Dict, Any, Optional
+from pptx.enum.text import PP_ALIGN, MSO_AUTO_SIZE, MSO_ANCHOR
+from pptx.oxml.ns import qn
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.text.text import Font
+from lxml import etree
+from typing import Dict, Any, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
 from agents.core.base_agent import BaseAgent
+from agents.core.markdown_parser import parse_markdown_content
+from agents.core.slide_info import SlideInfo
 from config import get_template_path
+import copy
+import functools
 import json
 import io
+import logging
+import math
 import os
 import re
+import tempfile
+
+try:
+    import orjson  # Faster JSON parsing for large slide payloads
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Template choice only depends on config.py - resolve it once per worker, not per request
+_DEFAULT_TEMPLATE_PATH = get_template_path("default")
+
+# Patterns that suggest tabular/comparative data - one alternation, so each item is a single search
+_TABLE_PATTERN = re.compile(
+    r'\w+\s*:\s*(?:'
+    r'\$[\d,]+'            # Item: $amount
+    r'|\d+\.?\d*%'         # Item: percentage
+    r'|\d+)'               # Item: number
+    r'|[A-Z][^:]*:\s*.+'   # Category: description
+)
+
+# Comparison indicators - plain substring match, same as `keyword in item.lower()`
+_COMPARISON_KEYWORDS = (
+    'vs', 'versus', 'compared to', 'difference', 'increase', 'decrease',
+    'before', 'after', 'baseline', 'target', 'actual', 'budget',
+    'quarter', 'year', 'month', 'period', 'phase'
+)
+_COMPARISON_KEYWORDS_RE = re.compile('|'.join(map(re.escape, _COMPARISON_KEYWORDS)), re.IGNORECASE)
+
+# First-row words that mark a table header line in _parse_table_data
+_HEADER_INDICATORS = (
+    'phase', 'description', 'item', 'value', 'category', 'type', 'name', 'amount', 'date', 'status'
+)
+
+# Timeline indicators - plain substring match, same as `month in text.lower()`
+_MONTHS = (
+    'january', 'february', 'march', 'april', 'may', 'june',
+    'july', 'august', 'september', 'october', 'november', 'december'
+)
+_MONTHS_RE = re.compile('|'.join(_MONTHS), re.IGNORECASE)
+_MONTHS_OR_QUARTERS_RE = re.compile('|'.join(_MONTHS + ('q1', 'q2', 'q3', 'q4')), re.IGNORECASE)
+
+# Payload looks like JSON - checked without copying the (often multi-KB) string via strip()
+_JSON_START = re.compile(r'\s*[\[{]')
+
+# Characters lxml refuses in <a:t> - python-pptx turns \v into <a:br> and escapes the rest as _xHHHH_
+_CONTROL_CHARS = re.compile(r'[\x00-\x08\x0B-\x1F]')
+
+
+def _set_16_9_aspect_ratio(prs: Presentation):
+    """Set presentation to 16:9 aspect ratio - STRICTLY ENFORCED"""
+    prs.slide_width = Inches(16)
+    prs.slide_height = Inches(9)
+    logger.debug("Enforced 16:9 aspect ratio: %.1f\" x %.1f\"", prs.slide_width.inches, prs.slide_height.inches)
+
+
+def _serialize_16_9(prs: Presentation) -> bytes:
+    """Enforce 16:9 on a template and serialize it - requests start from the already-resized copy"""
+    _set_16_9_aspect_ratio(prs)
+    template_buffer = io.BytesIO()
+    prs.save(template_buffer)
+    return template_buffer.getvalue()
+
+
+@functools.lru_cache(maxsize=4)
+def _load_template_bytes(template_path: str) -> bytes:
+    """Parse template file once - each request parses a fresh Presentation from these bytes"""
+    prs = Presentation(template_path)
+    logger.debug("Template original dimensions: %.1f\" x %.1f\"", prs.slide_width.inches, prs.slide_height.inches)
+    # ENFORCE 16:9 even with template for consistency
+    return _serialize_16_9(prs)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_default_template_bytes() -> bytes:
+    """Serialize python-pptx's bundled default template once instead of re-reading it per request"""
+    return _serialize_16_9(Presentation())
 
 class PowerPointBuilderAgent(BaseAgent):
     """Builds PowerPoint files with 16:9 aspect ratio and simple 2-color theme"""
@@ -20,6 +108,58 @@ class PowerPointBuilderAgent(BaseAgent):
     PRIMARY_COLOR = RGBColor(88, 77, 193)    # #584dc1 (purple)
     ACCENT_COLOR = RGBColor(209, 185, 91)    # #d1b95b (gold)
     TEXT_COLOR = RGBColor(51, 51, 51)        # Dark gray
+    HEADER_TEXT_COLOR = RGBColor(255, 255, 255)  # White table header text
+    FONT_NAME = 'Calibri'
+
+    # Title font sizes - built once instead of per run
+    _SIZE_TITLE_LG = Pt(36)    # Title and Thank You slides
+    _SIZE_TITLE_SM = Pt(32)    # All other slides
+
+    # Content and table font sizes - built once instead of per run
+    _SIZES_CONTENT = {size: Pt(size) for size in (20, 22, 24)}
+    _SIZE_TABLE_HEADER = Pt(16)
+    _SIZE_TABLE_CELL = Pt(14)
+
+    # Content text margins - optimized for 16:9 aspect ratio (16" x 9" slide)
+    _MARGIN_LEFT = Inches(0.4)     # Professional left margin
+    _MARGIN_RIGHT = Inches(0.4)    # Balanced right margin
+    _MARGIN_TOP = Inches(0.3)      # Clean top spacing
+    _MARGIN_BOTTOM = Inches(0.4)   # Adequate bottom spacing
+
+    # Table geometry for 16:9 aspect ratio
+    _TABLE_LEFT = Inches(0.8)      # Start closer to left edge
+    _TABLE_TOP = Inches(2.2)       # Below title area
+    _TABLE_WIDTH = Inches(14.4)    # Almost full width (16" - 0.8" left - 0.8" right)
+    _TABLE_HEIGHT = Inches(5.5)    # Good height for 16:9 ratio
+    _TABLE_COL_WIDTHS = (
+        Inches(6.0),               # First column (labels) - slightly larger
+        Inches(8.4),               # Second column (values) - use remaining space
+    )
+
+    # SIMPLE 3-LAYOUT SYSTEM:
+    # Layout 0: Opening slide (title/intro) - used once
+    # Layout 1: Content slide (standard) - used for most slides
+    # Layout 2: Ending slide (thank you/NCS) - used once
+    _LAYOUT_INDEXES = {
+        "TITLE_SLIDE": 0,
+        "CONTENT_SLIDE": 1,
+        "THANK_YOU_SLIDE": 2,
+    }
+
+    # Slide types with dedicated content formatters - everything else uses _format_any_slide_content
+    _SLIDE_FORMATTERS = {
+        "THANK_YOU_SLIDE": "_format_thank_you_slide",
+    }
+
+    # Slide types whose content is never turned into a table
+    _NO_TABLE_TYPES = frozenset({"TITLE_SLIDE", "AGENDA_SLIDE"})
+    _MIN_TABLE_ITEMS = 3    # Require at least 3 items for comparison
+
+    # Saved decks larger than this are spooled to disk while the zip is written
+    _SAVE_SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+    # Decks this large format their slides on a thread pool (slides are still added in order)
+    _PARALLEL_FORMAT_MIN_SLIDES = 20
 
     agent_description = "PowerPoint file generation with 16:9 aspect ratio and template support"
     agent_use_cases = [
@@ -32,196 +172,211 @@ class PowerPointBuilderAgent(BaseAgent):
 
     def __init__(self, **kwargs):
         super().__init__()
+        # Content placeholder idx per slide layout - reset for every presentation built
+        self._layout_content_ph_idx: Dict[int, Optional[int]] = {}
+        # Bound content formatters resolved once - one dict lookup per slide
+        self._format_dispatch = {
+            slide_type: getattr(self, method_name)
+            for slide_type, method_name in self._SLIDE_FORMATTERS.items()
+        }
+        # Table cell run properties (header, label, value) - copied into each run
+        self._table_run_props = (
+            self._build_run_properties(self._SIZE_TABLE_HEADER, bold=True, color=self.HEADER_TEXT_COLOR),
+            self._build_run_properties(self._SIZE_TABLE_CELL, bold=True),
+            self._build_run_properties(self._SIZE_TABLE_CELL),
+        )
+
+    def _build_run_properties(self, size, bold: bool = False, color: Optional[RGBColor] = None):
+        """Build an <a:rPr> once through python-pptx's Font - same XML as setting each run's font"""
+        run_props = OxmlElement('a:rPr')
+        font = Font(run_props)
+        font.name = self.FONT_NAME
+        font.size = size
+        if bold:
+            font.bold = True
+        if color is not None:
+            font.color.rgb = color
+        return run_props
     
-    def _set_16_9_aspect_ratio(self, prs: Presentation):
-        """Set presentation to 16:9 aspect ratio - STRICTLY ENFORCED"""
-        prs.slide_width = Inches(16)
-        prs.slide_height = Inches(9)
-        print(f"Enforced 16:9 aspect ratio: {prs.slide_width.inches:.1f}\" x {prs.slide_height.inches:.1f}\"")
-
-    async def process(self, slide_content: str, context_metadata: Optional[Dict[str, Any]] = None) -> bytes:
-        """Generate PowerPoint file from slide content with template support"""
+    async def process(self, slide_content: Union[str, list, dict], context_metadata: Optional[Dict[str, Any]] = None) -> bytes:
+        """Generate PowerPoint file from slide content (JSON/markdown text or already parsed slides)"""
+        self._layout_content_ph_idx = {}
+        # Parse once up front - parse errors are not template errors, and the fallback reuses the result
         try:
             slides_data = self._parse_slide_content(slide_content)
-            
+        except Exception as e:
+            logger.error("Slide content parsing error: %s", e)
+            raise Exception(f"Failed to generate PowerPoint: {str(e)}")
+
+        try:
             # Use template if available (controlled by config.py)
-            template_path = get_template_path("default")
+            # Cached template bytes are already 16:9
+            template_path = _DEFAULT_TEMPLATE_PATH
             if template_path:
-                print(f"Using template: {template_path}")
-                prs = Presentation(template_path)
-                print(f"Template original dimensions: {prs.slide_width.inches:.1f}\" x {prs.slide_height.inches:.1f}\"")
-                # ENFORCE 16:9 even with template for consistency
-                self._set_16_9_aspect_ratio(prs)
+                logger.debug("Using template: %s", template_path)
+                prs = Presentation(io.BytesIO(_load_template_bytes(template_path)))
             else:
-                print("Using python-pptx default template (no custom design)")
-                prs = Presentation()
-                # Only set 16:9 when not using custom template
-                self._set_16_9_aspect_ratio(prs)
-            
-            for slide_info in slides_data:
-                self._create_slide(prs, slide_info)
+                logger.debug("Using python-pptx default template (no custom design)")
+                prs = Presentation(io.BytesIO(_load_default_template_bytes()))
             
-            ppt_buffer = io.BytesIO()
-            prs.save(ppt_buffer)
-            ppt_buffer.seek(0)
+            self._build_slides(prs, slides_data)
             
-            return ppt_buffer.read()
+            return self._save_presentation(prs)
             
         except Exception as e:
-            print(f"PowerPoint building error: {str(e)}")
+            logger.error("PowerPoint building error: %s", e)
             # If template failed, try without template
             if "template" in str(e).lower():
-                print("Template failed, falling back to default")
+                logger.warning("Template failed, falling back to default")
                 try:
-                    slides_data = self._parse_slide_content(slide_content)
-                    prs = Presentation()  # Use python-pptx default
-                    
-                    # Set to 16:9 aspect ratio for fallback
-                    self._set_16_9_aspect_ratio(prs)
+                    # Placeholder cache is keyed by layouts of the discarded presentation
+                    self._layout_content_ph_idx = {}
+                    # Use python-pptx default - cached bytes are already 16:9
+                    prs = Presentation(io.BytesIO(_load_default_template_bytes()))
                     
-                    for slide_info in slides_data:
-                        self._create_slide(prs, slide_info)
+                    self._build_slides(prs, slides_data)
                     
-                    ppt_buffer = io.BytesIO()
-                    prs.save(ppt_buffer)
-                    ppt_buffer.seek(0)
-                    
-                    return ppt_buffer.read()
+                    return self._save_presentation(prs)
                 except Exception as fallback_error:
                     raise Exception(f"Failed to generate PowerPoint even with fallback: {str(fallback_error)}")
             
             raise Exception(f"Failed to generate PowerPoint: {str(e)}")
 
-    def _parse_slide_content(self, slide_content: str) -> list:
+    def _save_presentation(self, prs: Presentation) -> bytes:
+        """Serialize presentation to .pptx bytes"""
+        # Fresh buffer per deck - small decks stay in memory, large ones spill to a temp file
+        # while the zip is written so the growing buffer never doubles peak memory
+        with tempfile.SpooledTemporaryFile(max_size=self._SAVE_SPOOL_MAX_BYTES) as ppt_buffer:
+            prs.save(ppt_buffer)
+            ppt_buffer.seek(0)
+            return ppt_buffer.read()
+
+    def _parse_slide_content(self, slide_content: Union[str, list, dict]) -> list:
         """Parse slide content into structured data"""
+        # Already parsed by the caller - skip the JSON round-trip
+        if isinstance(slide_content, (list, dict)):
+            return self._unwrap_slides(slide_content)
+        
         try:
             # Clean up potential markdown formatting around JSON
-            if '```json' in slide_content:
-                slide_content = slide_content.split('```json')[1].split('```')[0]
-
-            if slide_content.strip().startswith(('[', '{')):
-                content_data = json.loads(slide_content)
-                # Handle cases where the JSON is a dict with a 'slides' key
-                if isinstance(content_data, dict):
-                    return content_data.get('slides') or content_data.get('presentation_structure', [])
-                return content_data
-        except (json.JSONDecodeError, IndexError):
+            # Body of a ```json fenced block - runs to end of text if the closing fence is missing
+            fence_start = slide_content.find('```json')
+            if fence_start != -1:
+                fence_start += len('```json')
+                fence_end = slide_content.find('```', fence_start)
+                slide_content = slide_content[fence_start:fence_end] if fence_end != -1 else slide_content[fence_start:]
+
+            if _JSON_START.match(slide_content):
+                content_data = orjson.loads(slide_content) if orjson else json.loads(slide_content)
+                return self._unwrap_slides(content_data)
+        except json.JSONDecodeError:
             # Fallback to markdown if JSON parsing fails
             pass
         
         return self._parse_markdown_content(slide_content)
 
+    def _unwrap_slides(self, content_data) -> list:
+        """Get the slide list from parsed JSON content"""
+        # Handle cases where the JSON is a dict with a 'slides' key
+        if isinstance(content_data, dict):
+            slides = content_data.get('slides')
+            if slides:
+                return self._normalize_slide_content(slides)
+            return self._normalize_slide_content(content_data.get('presentation_structure', []))
+        return self._normalize_slide_content(content_data)
+
+    def _normalize_slide_content(self, slides: list) -> list:
+        """Convert AI-generated slide dicts to SlideInfo records with list content"""
+        return [SlideInfo.from_dict(slide_data) for slide_data in slides]
+
     def _parse_markdown_content(self, content: str) -> list:
         """Parse markdown-style slide content"""
-        slides = []
-        current_slide = None
-        
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-                
-            if line.startswith(('# ', '## ')):
-                if current_slide:
-                    slides.append(current_slide)
-                current_slide = {
-                    "title": line.lstrip('# '),
-                    "content": [],
-                    "layout": "TITLE_SLIDE" if not slides else "CONTENT_SLIDE"
-                }
-            elif line.startswith(('- ', '* ')) and current_slide:
-                current_slide["content"].append(line.lstrip('- *'))
-            elif line and current_slide:
-                current_slide["content"].append(line)
-        
-        if current_slide:
-            slides.append(current_slide)
-        
-        if not slides:
-            slides = [{
-                "title": "Generated Presentation",
-                "content": ["Content extracted from document"],
-                "layout": "TITLE_SLIDE"
-            }]
-        
-        return slides
+        return parse_markdown_content(content)
 
-    def _create_slide(self, prs: Presentation, slide_info: dict):
-        """Create individual slide with formatting based on slide type"""
-        # Get slide type and determine layout
-        slide_type = slide_info.get("slide_type") or slide_info.get("layout", "CONTENT_SLIDE")
-        title = slide_info.get("title", "Slide Title")
+    def _build_slides(self, prs: Presentation, slides_data: list):
+        """Add all slides in order, then fill in their titles and content"""
+        layout_map = self._resolve_layout_map(prs)
+        # Adding slides touches the shared presentation part, so it stays sequential
+        pending = [self._create_slide(prs, slide_info, layout_map) for slide_info in slides_data]
+        
+        if len(pending) < self._PARALLEL_FORMAT_MIN_SLIDES:
+            for slide_args in pending:
+                self._format_slide_by_type(*slide_args)
+            return
         
-        # Content can come from either "content" (detailed) or "content_outline" (structure)
-        content = slide_info.get("content") or slide_info.get("content_outline", [])
+        # Each slide only mutates its own XML part - safe to format independently
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            list(pool.map(lambda slide_args: self._format_slide_by_type(*slide_args), pending))
+
+    def _create_slide(self, prs: Presentation, slide_info: SlideInfo, layout_map: Dict[str, Any]) -> tuple:
+        """Add an individual slide - returns the arguments for _format_slide_by_type"""
+        slide_type = slide_info.slide_type
+        title = slide_info.title
+        content = slide_info.content
         
         try:
             # Determine the appropriate PowerPoint layout based on slide type
-            slide_layout_index = self._get_layout_index(slide_type, prs)
-            slide_layout = prs.slide_layouts[slide_layout_index]
+            slide_layout = layout_map.get(slide_type, layout_map["CONTENT_SLIDE"])
             slide = prs.slides.add_slide(slide_layout)
             
-            print(f"Creating slide: {title} (type: {slide_type}, layout: {slide_layout_index})")
-            print(f"Available placeholders: {len(slide.placeholders)}")
+            # Layout name and placeholder count are XML reads - only pay for them when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Creating slide: %s (type: %s, layout: %s)", title, slide_type, slide_layout.name)
+                logger.debug("Available placeholders: %s", len(slide.placeholders))
             
-            # Apply type-specific formatting
-            self._format_slide_by_type(slide, slide_type, title, content)
+            # Type-specific formatting is applied by _build_slides
+            return slide, slide_type, title, content
             
         except Exception as e:
-            print(f"Error creating slide '{title}' of type '{slide_type}': {str(e)}")
+            logger.warning("Error creating slide '%s' of type '%s': %s", title, slide_type, e)
             # Try with a simpler approach - just set title if possible
-            slide_layout = prs.slide_layouts[0]  # Use title layout as fallback
+            slide_layout = layout_map["TITLE_SLIDE"]  # Use title layout (index 0) as fallback
             slide = prs.slides.add_slide(slide_layout)
-            if slide.shapes.title:
-                slide.shapes.title.text = title
+            title_shape = slide.shapes.title
+            if title_shape:
+                title_shape.text = title
             raise e
 
-    def _get_layout_index(self, slide_type: str, prs: Presentation) -> int:
-        """Get appropriate layout index - SIMPLE 3-LAYOUT SYSTEM"""
-        max_layouts = len(prs.slide_layouts)
-        print(f"Template has {max_layouts} layouts available")
-        
-        # SIMPLE 3-LAYOUT SYSTEM:
-        # Layout 0: Opening slide (title/intro) - used once
-        # Layout 1: Content slide (standard) - used for most slides
-        # Layout 2: Ending slide (thank you/NCS) - used once
-        
-        if slide_type == "TITLE_SLIDE":
-            layout_index = 0  # Opening slide
-        elif slide_type == "THANK_YOU_SLIDE":
-            layout_index = 2  # Ending slide
-        else:
-            layout_index = 1  # Content slide for everything else
-        
-        # Fallback if layout doesn't exist
-        if layout_index >= max_layouts:
-            print(f"Warning: Layout {layout_index} not available, using layout 0")
-            layout_index = 0
-            
-        print(f"Using layout {layout_index} for slide type {slide_type}")
-        return layout_index
+    def _resolve_layout_map(self, prs: Presentation) -> Dict[str, Any]:
+        """Resolve the slide layout for each layout slot once per presentation"""
+        slide_layouts = prs.slide_layouts
+        max_layouts = len(slide_layouts)
+        logger.debug("Template has %s layouts available", max_layouts)
+        
+        # Every slide type other than TITLE_SLIDE / THANK_YOU_SLIDE shares the CONTENT_SLIDE layout
+        layout_map = {}
+        for slide_type, layout_index in self._LAYOUT_INDEXES.items():
+            # Fallback if layout doesn't exist
+            if layout_index >= max_layouts:
+                logger.warning("Layout %s not available, using layout 0", layout_index)
+                layout_index = 0
+            logger.debug("Using layout %s for slide type %s", layout_index, slide_type)
+            layout_map[slide_type] = slide_layouts[layout_index]
+        return layout_map
 
     def _format_slide_by_type(self, slide, slide_type: str, title: str, content):
         """Apply type-specific formatting to slide"""
         try:
             # Set title - DON'T apply custom formatting, use template's formatting
-            if slide.shapes.title:
-                print(f"Found title shape, setting to: {title}")
-                slide.shapes.title.text = title
-                print(f"Successfully set slide title: {title}")
+            title_shape = slide.shapes.title  # Walks the shape tree - look it up once
+            if title_shape:
+                logger.debug("Found title shape, setting to: %s", title)
+                title_shape.text = title
+                logger.debug("Successfully set slide title: %s", title)
                 # Remove custom formatting to preserve template fonts
-                # self._apply_title_format_by_type(slide.shapes.title, slide_type)  # REMOVED
+                # self._apply_title_format_by_type(title_shape, slide_type)  # REMOVED
             else:
-                print(f"No title shape found for slide with title: {title}")
+                logger.debug("No title shape found for slide with title: %s", title)
         except Exception as e:
-            print(f"Error setting title '{title}': {e}")
+            logger.warning("Error setting title '%s': %s", title, e)
         
         try:
-            # SIMPLIFIED: Use the same content formatting for all slide types
+            # SIMPLIFIED: Most slide types share the same content formatting
             # Only the layout (0, 1, or 2) determines the visual design
-            self._format_any_slide_content(slide, content, slide_type)
+            formatter = self._format_dispatch.get(slide_type, self._format_any_slide_content)
+            formatter(slide, content, slide_type)
         except Exception as e:
-            print(f"Error formatting slide content for type {slide_type}: {e}")
+            logger.warning("Error formatting slide content for type %s: %s", slide_type, e)
             # Just leave the slide as-is if formatting fails
 
     def _format_title_slide(self, slide, content):
@@ -232,11 +387,11 @@ class PowerPointBuilderAgent(BaseAgent):
                 subtitle_text = content[0] if content else "Professional Business Presentation"
                 subtitle_placeholder.text = str(subtitle_text)
                 self._apply_smart_text_formatting(subtitle_placeholder, str(subtitle_text))
-                print(f"Set title slide subtitle: {subtitle_text}")
+                logger.debug("Set title slide subtitle: %s", subtitle_text)
             except Exception as e:
-                print(f"Error setting title slide content: {e}")
+                logger.warning("Error setting title slide content: %s", e)
         else:
-            print("No subtitle placeholder found for title slide")
+            logger.debug("No subtitle placeholder found for title slide")
 
     def _format_ncs_ending_slide(self, slide, content):
         """Format NCS Singapore ending slide - preserve template design"""
@@ -247,12 +402,12 @@ class PowerPointBuilderAgent(BaseAgent):
                 ending_text = "Thank you"
                 content_placeholder.text = ending_text
                 self._apply_smart_text_formatting(content_placeholder, ending_text)
-                print(f"Set NCS ending slide content: '{ending_text}'")
+                logger.debug("Set NCS ending slide content: '%s'", ending_text)
                 
             except Exception as e:
-                print(f"Error setting NCS ending content: {e}")
+                logger.warning("Error setting NCS ending content: %s", e)
         else:
-            print("No content placeholder found for NCS ending slide")
+            logger.debug("No content placeholder found for NCS ending slide")
 
     def _format_standout_slide(self, slide, content):
         """Format stand out message slide - preserve template design"""
@@ -261,40 +416,42 @@ class PowerPointBuilderAgent(BaseAgent):
             try:
                 # Format as prominent message
                 standout_content = content if content else ["Key Message or Insight"]
-                content_list = standout_content if isinstance(standout_content, list) else [standout_content]
-                
                 # Simple text assignment - let template handle the formatting
-                standout_text = '\n'.join(content_list[:2])  # Max 2 items for standout
+                standout_text = '\n'.join(map(str, standout_content[:2]))  # Max 2 items for standout
                 content_placeholder.text = standout_text
                 self._apply_smart_text_formatting(content_placeholder, standout_text)
-                print(f"Set standout slide content")
+                logger.debug("Set standout slide content")
                 
             except Exception as e:
-                print(f"Error setting standout content: {e}")
+                logger.warning("Error setting standout content: %s", e)
         else:
-            print("No content placeholder found for standout slide")
+            logger.debug("No content placeholder found for standout slide")
+
+    def _format_thank_you_slide(self, slide, content, slide_type):
+        """Thank You slide keeps only the title - remove content placeholder to avoid duplication"""
+        content_placeholder = self._find_content_placeholder(slide)
+        if content_placeholder:
+            try:
+                # Remove the content placeholder entirely - only keep the title
+                self._remove_shape(content_placeholder)
+                logger.debug("Removed content placeholder from Thank You slide - title only")
+            except Exception as e:
+                logger.warning("Error removing Thank You slide content placeholder: %s", e)
 
     def _format_any_slide_content(self, slide, content, slide_type):
         """SIMPLIFIED: Format any slide content with table detection and smart formatting"""
         content_placeholder = self._find_content_placeholder(slide)
         
-        # SPECIAL HANDLING: For Thank You slide, remove content placeholder to avoid duplication
-        if slide_type == "THANK_YOU_SLIDE":
-            if content_placeholder:
-                try:
-                    # Remove the content placeholder entirely - only keep the title
-                    slide.shapes._spTree.remove(content_placeholder._element)
-                    print(f"Removed content placeholder from Thank You slide - title only")
-                except Exception as e:
-                    print(f"Error removing Thank You slide content placeholder: {e}")
-            return
-        
         if content_placeholder and content:
             try:
-                content_list = content if isinstance(content, list) else [content]
+                # Content is always a list - normalized by _parse_slide_content
+                content_list = content
                 
-                # Skip table detection for Title and Agenda slides
-                should_check_table = slide_type not in ["TITLE_SLIDE", "AGENDA_SLIDE"]
+                # Skip table detection for Title and Agenda slides, and for lists too short to be a table
+                should_check_table = (
+                    len(content_list) >= self._MIN_TABLE_ITEMS and
+                    slide_type not in self._NO_TABLE_TYPES
+                )
                 
                 # Check if content should be a table (only for appropriate slide types)
                 table_info = self._detect_table_content(content_list) if should_check_table else {"is_table": False}
@@ -302,96 +459,120 @@ class PowerPointBuilderAgent(BaseAgent):
                 if table_info["is_table"]:
                     # Remove the content placeholder and create a table instead
                     try:
-                        slide.shapes._spTree.remove(content_placeholder._element)
-                        print(f"Removed text placeholder to create table")
+                        self._remove_shape(content_placeholder)
+                        logger.debug("Removed text placeholder to create table")
                     except:
-                        print("Could not remove placeholder, creating table anyway")
+                        logger.warning("Could not remove placeholder, creating table anyway")
                     
                     # Create table
                     if self._create_table_slide(slide, table_info):
-                        print(f"Successfully created table for {slide_type}")
+                        logger.debug("Successfully created table for %s", slide_type)
                         return
                     else:
-                        print(f"Table creation failed, falling back to text for {slide_type}")
+                        logger.warning("Table creation failed, falling back to text for %s", slide_type)
                 
                 # Standard text formatting (not a table)
                 if len(content_list) == 1:
                     # Single item - could be paragraph or single point
-                    content_placeholder.text = str(content_list[0])
+                    content_text = str(content_list[0])
                 else:
                     # Multiple items - DON'T add manual bullets, let PowerPoint's template handle it
-                    content_text = '\n'.join([str(item) for item in content_list[:6]])
-                    content_placeholder.text = content_text
+                    content_text = '\n'.join(map(str, content_list[:6]))
+                self._set_paragraphs(content_placeholder, content_text)
                 
                 # Apply smart text formatting with auto-fit
-                self._apply_smart_text_formatting(content_placeholder, content_text if len(content_list) > 1 else str(content_list[0]))
+                self._apply_smart_text_formatting(content_placeholder, content_text)
                     
-                print(f"Successfully set content for {slide_type}: {len(content_list)} items")
+                logger.debug("Successfully set content for %s: %s items", slide_type, len(content_list))
                 
             except Exception as e:
-                print(f"Error setting {slide_type} content: {e}")
+                logger.warning("Error setting %s content: %s", slide_type, e)
                 # Ultimate fallback
                 try:
-                    simple_text = str(content[0]) if isinstance(content, list) and content else str(content)
+                    simple_text = str(content[0])
                     content_placeholder.text = simple_text
                     self._apply_smart_text_formatting(content_placeholder, simple_text)
-                    print("Used simple text fallback")
+                    logger.debug("Used simple text fallback")
                 except Exception as e2:
-                    print(f"All methods failed for {slide_type}: {e2}")
+                    logger.warning("All methods failed for %s: %s", slide_type, e2)
         else:
-            print(f"No content placeholder or content for {slide_type}. Placeholder: {bool(content_placeholder)}, Content: {bool(content)}")
+            logger.debug("No content placeholder or content for %s. Placeholder: %s, Content: %s", slide_type, bool(content_placeholder), bool(content))
+
+    def _set_paragraphs(self, content_placeholder, content_text: str):
+        """Write one <a:p> per line straight into the text body - same result as setting .text"""
+        txBody = content_placeholder.text_frame._txBody
+        txBody.clear_content()
+        for line in content_text.split('\n'):
+            if _CONTROL_CHARS.search(line):
+                # Rare - let python-pptx handle soft breaks and escaping, exactly as .text would
+                txBody.add_p().append_text(line)
+                continue
+            paragraph = etree.SubElement(txBody, qn('a:p'))
+            if line:
+                run = etree.SubElement(paragraph, qn('a:r'))
+                etree.SubElement(run, qn('a:t')).text = line
 
     def _apply_title_format_by_type(self, title_shape, slide_type: str):
         """Apply title formatting based on slide type"""
-        if title_shape.has_text_frame:
-            for paragraph in title_shape.text_frame.paragraphs:
-                for run in paragraph.runs:
-                    font = run.font
-                    font.name = 'Calibri'
-                    
-                    # Different sizes for different slide types
-                    if slide_type in ["TITLE_SLIDE", "THANK_YOU_SLIDE"]:
-                        font.size = Pt(36)
-                    else:
-                        font.size = Pt(32)
-                    
-                    font.bold = True
-                    font.color.rgb = self.PRIMARY_COLOR
+        # Different sizes for different slide types - same for every run
+        if slide_type in ["TITLE_SLIDE", "THANK_YOU_SLIDE"]:
+            title_size = self._SIZE_TITLE_LG
+        else:
+            title_size = self._SIZE_TITLE_SM
+        title_color = self.PRIMARY_COLOR
+        font_name = self.FONT_NAME
+        
+        # Title placeholders always carry a text frame - setting .text already relied on it
+        for paragraph in title_shape.text_frame.paragraphs:
+            for run in paragraph.runs:
+                font = run.font
+                font.name = font_name
+                font.size = title_size
+                font.bold = True
+                font.color.rgb = title_color
 
 
+    @staticmethod
+    def _remove_shape(shape):
+        """Detach a shape's XML element straight from its parent spTree"""
+        element = shape._element
+        element.getparent().remove(element)
+
     def _find_content_placeholder(self, slide):
         """Find the content placeholder in a slide (NOT the title placeholder)"""
-        print(f"Looking for content placeholder in slide with {len(slide.placeholders)} placeholders")
-        
-        # First, let's inspect what placeholders we actually have
-        for i, placeholder in enumerate(slide.placeholders):
+        # Slides on the same layout share placeholder structure - reuse the earlier result
+        layout_key = id(slide.slide_layout)
+        if layout_key in self._layout_content_ph_idx:
+            ph_idx = self._layout_content_ph_idx[layout_key]
+            if ph_idx is None:
+                return None
             try:
-                has_text_frame = hasattr(placeholder, 'has_text_frame') and placeholder.has_text_frame
-                is_title = placeholder == slide.shapes.title
-                print(f"Placeholder {i}: has_text_frame={has_text_frame}, is_title={is_title}")
-            except Exception as e:
-                print(f"Placeholder {i}: Error checking - {e}")
+                return slide.placeholders[ph_idx]
+            except KeyError:
+                pass
         
         # Try to find a content placeholder (NOT the title)
+        title_shape = slide.shapes.title
         for i, placeholder in enumerate(slide.placeholders):
             try:
                 # CRITICALLY IMPORTANT: Skip the title placeholder completely
-                if slide.shapes.title and placeholder == slide.shapes.title:
-                    print(f"Skipping placeholder {i} (it's the title placeholder)")
+                if title_shape and placeholder == title_shape:
                     continue
                     
-                # Check if this placeholder can hold text
-                if hasattr(placeholder, 'has_text_frame') and placeholder.has_text_frame:
-                    # Additional check - try to access the text_frame
-                    _ = placeholder.text_frame
-                    print(f"Found working content placeholder at index {i}")
-                    return placeholder
+                # Check if this placeholder can hold text - non-text shapes have no text_frame
+                _ = placeholder.text_frame
+                logger.debug("Found working content placeholder at index %s", i)
+                self._layout_content_ph_idx[layout_key] = placeholder.placeholder_format.idx
+                return placeholder
                     
+            except AttributeError:
+                continue
             except Exception as e:
-                print(f"Placeholder {i}: Error accessing - {e}")
+                logger.warning("Placeholder %s: Error accessing - %s", i, e)
                 continue
         
-        print("No working content placeholder found!")
+        logger.debug("No working content placeholder found")
+        self._layout_content_ph_idx[layout_key] = None
         return None
 
     def _apply_smart_text_formatting(self, content_placeholder, content_text: str):
@@ -433,17 +614,16 @@ class PowerPointBuilderAgent(BaseAgent):
             text_frame.word_wrap = True
             
             # Configure auto-sizing behavior
-            from pptx.enum.text import MSO_AUTO_SIZE, MSO_ANCHOR
             text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
             
             # Set vertical text alignment - center vertically within the text box
             text_frame.vertical_anchor = MSO_ANCHOR.TOP  # Options: TOP, MIDDLE, BOTTOM
             
             # Optimized margins for 16:9 aspect ratio (16" x 9" slide)
-            text_frame.margin_left = Inches(0.4)    # Professional left margin
-            text_frame.margin_right = Inches(0.4)   # Balanced right margin  
-            text_frame.margin_top = Inches(0.3)     # Clean top spacing
-            text_frame.margin_bottom = Inches(0.4)  # Adequate bottom spacing
+            text_frame.margin_left = self._MARGIN_LEFT
+            text_frame.margin_right = self._MARGIN_RIGHT
+            text_frame.margin_top = self._MARGIN_TOP
+            text_frame.margin_bottom = self._MARGIN_BOTTOM
             
             # Set a good starting font size - let auto-fit adjust as needed
             char_count = len(content_text.strip())
@@ -455,54 +635,51 @@ class PowerPointBuilderAgent(BaseAgent):
                 base_font_size = 20  # Smaller starting size for long content
             
             # Apply base font size and alignment to all content
-            from pptx.enum.text import PP_ALIGN
-            for paragraph in text_frame.paragraphs:
+            # Walks <a:p>/<a:r> directly - same XML writes as the paragraph/run/font proxies, without building them
+            font_name = self.FONT_NAME
+            font_size = self._SIZES_CONTENT[base_font_size].centipoints
+            align_left = PP_ALIGN.LEFT
+            for paragraph in text_frame._txBody.p_lst:
                 # Set paragraph alignment (left is usually best for bullet points)
-                paragraph.alignment = PP_ALIGN.LEFT
+                paragraph.get_or_add_pPr().algn = align_left
                 
-                for run in paragraph.runs:
-                    run.font.size = Pt(base_font_size)
-                    run.font.name = 'Calibri'
+                for run in paragraph.r_lst:
+                    run_props = run.get_or_add_rPr()
+                    run_props.sz = font_size
+                    run_props.get_or_add_latin().typeface = font_name
                         
-            print(f"Applied auto-fit formatting with {base_font_size}pt base size for {char_count} characters")
+            logger.debug("Applied auto-fit formatting with %spt base size for %s characters", base_font_size, char_count)
             
         except Exception as e:
-            print(f"Error applying smart text formatting: {e}")
+            logger.warning("Error applying smart text formatting: %s", e)
 
     def _detect_table_content(self, content_list: list) -> dict:
         """Detect if content should be presented as a table - only when there's comparative/structured data"""
-        if not content_list or len(content_list) < 3:  # Require at least 3 items for comparison
+        if not content_list or len(content_list) < self._MIN_TABLE_ITEMS:
             return {"is_table": False}
         
-        # Look for patterns that suggest tabular/comparative data
-        table_patterns = [
-            r'\w+\s*:\s*\$[\d,]+',      # Item: $amount
-            r'\w+\s*:\s*\d+\.?\d*%',    # Item: percentage  
-            r'\w+\s*:\s*\d+',           # Item: number
-            r'[A-Z][^:]*:\s*.+',        # Category: description
-        ]
-        
-        # Also look for comparison indicators
-        comparison_keywords = [
-            'vs', 'versus', 'compared to', 'difference', 'increase', 'decrease',
-            'before', 'after', 'baseline', 'target', 'actual', 'budget',
-            'quarter', 'year', 'month', 'period', 'phase'
-        ]
-        
         matches = 0
         has_comparison_context = False
+        # Smallest match count that passes the threshold check below
+        needed = max(3, math.ceil(len(content_list) * 0.6))
+        sample = content_list[:6]  # Check first 6 items
         
         # Check for structured data patterns
-        for item in content_list[:6]:  # Check first 6 items
-            item_str = str(item).lower()
-            for pattern in table_patterns:
-                if re.search(pattern, str(item)):
-                    matches += 1
-                    break
+        for i, item in enumerate(sample):
+            # Remaining items can no longer reach the threshold - not a table
+            if matches + len(sample) - i < needed:
+                return {"is_table": False}
+            item_text = item if type(item) is str else str(item)
+            if _TABLE_PATTERN.search(item_text):
+                matches += 1
             
             # Check for comparison context
-            if any(keyword in item_str for keyword in comparison_keywords):
+            if not has_comparison_context and _COMPARISON_KEYWORDS_RE.search(item_text):
                 has_comparison_context = True
+            
+            # Threshold already met - later items can't change the outcome
+            if matches >= needed and (has_comparison_context or matches >= 4):
+                break
         
         # Only create table if:
         # 1. 60%+ of items match table patterns (raised from 50%)
@@ -527,27 +704,29 @@ class PowerPointBuilderAgent(BaseAgent):
         
         # Check if first item looks like headers (no colon, contains common header words)
         first_item = str(content_list[0]).strip() if content_list else ""
-        header_indicators = ['phase', 'description', 'item', 'value', 'category', 'type', 'name', 'amount', 'date', 'status']
+        first_lower = first_item.lower()
+        has_indicator = any(indicator in first_lower for indicator in _HEADER_INDICATORS)
         
         has_headers = (
             ':' not in first_item and  # Headers typically don't have colons
-            any(indicator in first_item.lower() for indicator in header_indicators) and
+            has_indicator and
             len(content_list) > 1
         )
         
         if has_headers:
             # Create proper headers based on content analysis
-            sample_content = content_list[1] if len(content_list) > 1 else content_list[0]
+            sample_content = str(content_list[1] if len(content_list) > 1 else content_list[0])
+            sample_lower = sample_content.lower()
             
-            if 'phase' in first_item.lower():
+            if 'phase' in first_lower:
                 headers = ["Phase", "Description"]
-            elif 'budget' in first_item.lower() or '$' in str(sample_content):
+            elif 'budget' in first_lower or '$' in sample_content:
                 headers = ["Item", "Amount"]
-            elif 'team' in first_item.lower() or 'member' in str(sample_content).lower():
+            elif 'team' in first_lower or 'member' in sample_lower:
                 headers = ["Team", "Size"]
-            elif 'metric' in first_item.lower() or '%' in str(sample_content):
+            elif 'metric' in first_lower or '%' in sample_content:
                 headers = ["Metric", "Value"]
-            elif 'timeline' in first_item.lower() or any(month in str(sample_content).lower() for month in ['january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december']):
+            elif 'timeline' in first_lower or _MONTHS_RE.search(sample_content):
                 headers = ["Deliverable", "Timeline"]
             else:
                 # Generic headers based on content structure
@@ -556,54 +735,40 @@ class PowerPointBuilderAgent(BaseAgent):
             table_data.append(headers)
             
             # Process all items as data rows (skip first item if it was just header indicator)
-            start_index = 1 if any(indicator in first_item.lower() for indicator in header_indicators) else 0
-            
-            for item in content_list[start_index:]:
-                item_str = str(item).strip()
-                
-                # Split on colon for key:value pairs
-                if ':' in item_str:
-                    parts = item_str.split(':', 1)
-                    if len(parts) == 2:
-                        table_data.append([parts[0].strip(), parts[1].strip()])
-                    else:
-                        table_data.append([item_str, ""])
-                else:
-                    # If no colon, put entire text in first column
-                    table_data.append([item_str, ""])
+            start_index = 1 if has_indicator else 0
         else:
             # No headers detected - add generic headers and process as key:value pairs
             # Analyze content to determine appropriate headers
             sample_content = str(content_list[0]) if content_list else ""
+            sample_lower = sample_content.lower()
             
             if '$' in sample_content:
                 headers = ["Item", "Amount"]
             elif '%' in sample_content:
                 headers = ["Factor", "Percentage"]
-            elif any(month in sample_content.lower() for month in ['january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december', 'q1', 'q2', 'q3', 'q4']):
+            elif _MONTHS_OR_QUARTERS_RE.search(sample_content):
                 headers = ["Activity", "Timeline"]
-            elif 'team' in sample_content.lower() or 'department' in sample_content.lower():
+            elif 'team' in sample_lower or 'department' in sample_lower:
                 headers = ["Department", "Details"]
             else:
                 headers = ["Item", "Details"]
             
             table_data.append(headers)
+            start_index = 0
+        
+        # Limit to 8 rows for readability - header plus the first 7 items, later items are never parsed
+        for item in content_list[start_index:start_index + 7]:
+            item_str = str(item).strip()
             
-            for item in content_list:
-                item_str = str(item).strip()
-                
-                # Split on colon for key:value pairs
-                if ':' in item_str:
-                    parts = item_str.split(':', 1)
-                    if len(parts) == 2:
-                        table_data.append([parts[0].strip(), parts[1].strip()])
-                    else:
-                        table_data.append([item_str, ""])
-                else:
-                    # If no colon, put entire text in first column
-                    table_data.append([item_str, ""])
+            # Split on colon for key:value pairs
+            key, colon, value = item_str.partition(':')
+            if colon:
+                table_data.append([key.strip(), value.strip()])
+            else:
+                # If no colon, put entire text in first column
+                table_data.append([item_str, ""])
         
-        return table_data[:8]  # Limit to 8 rows for readability
+        return table_data
 
     def _create_table_slide(self, slide, table_info: dict):
         """Create a table on the slide"""
@@ -612,19 +777,20 @@ class PowerPointBuilderAgent(BaseAgent):
             cols = table_info["cols"] 
             data = table_info["data"]
             
-            # Position table optimally for 16:9 aspect ratio (16" x 9" slide)
-            left = Inches(0.8)     # Start closer to left edge
-            top = Inches(2.2)      # Below title area
-            width = Inches(14.4)   # Almost full width (16" - 0.8" left - 0.8" right)
-            height = Inches(5.5)   # Good height for 16:9 ratio
-            
-            # Add table shape
-            table_shape = slide.shapes.add_table(rows, cols, left, top, width, height)
+            # Add table shape, positioned optimally for 16:9 aspect ratio (16" x 9" slide)
+            table_shape = slide.shapes.add_table(
+                rows, cols, self._TABLE_LEFT, self._TABLE_TOP, self._TABLE_WIDTH, self._TABLE_HEIGHT
+            )
             table = table_shape.table
             
             # Set column widths optimized for 16:9 ratio and readability
-            table.columns[0].width = Inches(6.0)   # First column (labels) - slightly larger
-            table.columns[1].width = Inches(8.4)   # Second column (values) - use remaining space
+            table.columns[0].width = self._TABLE_COL_WIDTHS[0]
+            table.columns[1].width = self._TABLE_COL_WIDTHS[1]
+            
+            # Theme values shared by every cell
+            header_props, label_props, value_props = self._table_run_props
+            header_fill_color = self.PRIMARY_COLOR
+            align_left = PP_ALIGN.LEFT
             
             # Fill table with data
             for row_idx, row_data in enumerate(data):
@@ -640,31 +806,30 @@ class PowerPointBuilderAgent(BaseAgent):
                     
                     # Format cell text
                     paragraph = cell.text_frame.paragraphs[0]
-                    paragraph.alignment = PP_ALIGN.LEFT
+                    paragraph.alignment = align_left
                     
-                    for run in paragraph.runs:
-                        run.font.name = 'Calibri'
-                        
-                        # Header row formatting (first row)
-                        if row_idx == 0:
-                            run.font.size = Pt(16)
-                            run.font.bold = True
-                            run.font.color.rgb = RGBColor(255, 255, 255)  # White text
-                            # Set header row background color
-                            cell.fill.solid()
-                            cell.fill.fore_color.rgb = RGBColor(88, 77, 193)  # Purple theme color
-                        else:
-                            # Content rows
-                            run.font.size = Pt(14)
-                            # Make first column bold (labels) for content rows
-                            if col_idx == 0:
-                                run.font.bold = True
+                    if row_idx == 0:
+                        run_props = header_props    # Header row: bold white text
+                    elif col_idx == 0:
+                        run_props = label_props     # Make first column bold (labels) for content rows
+                    else:
+                        run_props = value_props
+                    
+                    # Runs were just created by cell.text and carry no <a:rPr> yet - copy in the prebuilt one
+                    runs = paragraph._p.r_lst
+                    for run in runs:
+                        run.insert(0, copy.deepcopy(run_props))
+                    
+                    if row_idx == 0 and runs:
+                        # Set header row background color
+                        cell.fill.solid()
+                        cell.fill.fore_color.rgb = header_fill_color  # Purple theme color
             
-            print(f"Created table with {rows} rows and {cols} columns")
+            logger.debug("Created table with %s rows and %s columns", rows, cols)
             return True
             
         except Exception as e:
-            print(f"Error creating table: {e}")
+            logger.warning("Error creating table: %s", e)
             return False
 
     def _apply_content_format(self, paragraph):
@@ -3,28 +3,109 @@ Presentation Structure Agent - Content analysis + slide planning + structure cre
 """
 from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.functions import KernelArguments
-from config import get_ai_service, apply_config_overrides, get_max_slides, PRESENTATION_CONFIG, get_outline_structure
+from config import get_ai_service, apply_config_overrides, get_max_slides, PRESENTATION_CONFIG, get_outline_structure, RESPONSE_CACHE_CONFIG
 from typing import Dict, Any, Optional
 from agents.core.base_agent import BaseAgent
+from agents.core.response_cache import ResponseCache
+import functools
 import json
+import os
+import re
 
-class PresentationStructureAgent(BaseAgent):
-    """Analyzes content volume, determines optimal slides, and creates presentation structure"""
+try:
+    import orjson  # Faster JSON parsing/serialization for AI responses
+except ImportError:
+    orjson = None
 
-    agent_description = "Content analysis, slide count determination, and presentation structure creation"
-    agent_use_cases = [
-        "Content volume analysis",
-        "Optimal slide count determination", 
-        "Slide sequence planning",
-        "Presentation structure creation"
-    ]
+def _dumps(data: dict) -> str:
+    """Indented JSON text for the next agent - orjson when available"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(data, indent=2)
 
-    def __init__(self, **kwargs):
-        super().__init__()
-        config = apply_config_overrides(self.__class__.__name__, **kwargs)
-        self.service, self.default_execution_settings = get_ai_service(**config)
+# Placeholder outlines for fallback/padded slides - immutable, built once per worker
+_CONTENT_OUTLINES = {
+    "TITLE_SLIDE": ("Main title", "Subtitle", "Presenter information"),
+    "AGENDA_SLIDE": ("Topic 1", "Topic 2", "Topic 3", "Q&A"),
+    "INTRODUCTION_SLIDE": ("Background", "Context", "Objectives"),
+    "KEY_INSIGHT_SLIDE": ("Main finding", "Supporting evidence", "Implications"),
+    "RECOMMENDATIONS_SLIDE": ("Action item 1", "Action item 2", "Next steps"),
+    "CONCLUSION_SLIDE": ("Key takeaways", "Summary of insights", "Final thoughts"),
+    "THANK_YOU_SLIDE": ("Thank you",)
+}
+_DEFAULT_CONTENT_OUTLINE = ("Key point 1", "Key point 2", "Key point 3")
+
+@functools.lru_cache(maxsize=32)
+def _outline_slots(slide_count: int) -> tuple:
+    """(type, title) pairs of the standard outline - deterministic per slide count"""
+    return tuple((item["type"], item["title"]) for item in get_outline_structure(slide_count))
+
+# Validated structures for documents seen before - shared by every agent instance in this worker
+_STRUCTURE_CACHE = ResponseCache(RESPONSE_CACHE_CONFIG["max_entries"], RESPONSE_CACHE_CONFIG["ttl_seconds"])
+
+# Page furniture left behind by PDF/Word extraction: "Page 3", "Page 3 of 10", "- 3 -".
+# Bare numbers are kept - one-per-line table cells look exactly like page numbers.
+_PAGE_MARKER_LINE = re.compile(r'^\s*(?:page\s+\d+(?:\s+of\s+\d+)?|-\s*\d{1,4}\s*-)\s*$', re.IGNORECASE)
+_INLINE_WHITESPACE = re.compile(r'[ \t\f\v\u00a0]+')
+_MIN_DEDUP_LINE_LENGTH = 40  # Short lines (table cells, "N/A") legitimately repeat
 
-        instructions = f"""
+def _compress_content(text: str) -> str:
+    """Drop whitespace runs, page markers and repeated lines before the document goes to the model"""
+    lines = []
+    seen = set()
+    blank = False
+    for line in text.splitlines():
+        body = _INLINE_WHITESPACE.sub(' ', line).strip()
+        if not body:
+            blank = bool(lines)
+            continue
+        if _PAGE_MARKER_LINE.match(body):
+            continue
+        # Running headers/footers repeat on every page - keep the first occurrence only
+        if len(body) >= _MIN_DEDUP_LINE_LENGTH:
+            if body in seen:
+                continue
+            seen.add(body)
+        if blank:
+            lines.append('')
+            blank = False
+        # Leading indentation carries nested-bullet structure
+        lines.append(line[:len(line) - len(line.lstrip())] + body)
+    return '\n'.join(lines)
+
+# Shape of the expected response - sent compact, the model does not need the indentation
+_OUTPUT_SCHEMA = {
+    "content_analysis": {
+        "main_topics": ["topic1", "topic2", "topic3"],
+        "content_complexity": "light|medium|heavy",
+        "estimated_duration": "10-15 minutes"
+    },
+    "slide_planning": {
+        "optimal_slides": 10,
+        "reasoning": "Based on content analysis: X main topics identified, requiring Y slides for optimal presentation flow and audience engagement",
+        "max_slides_enforced": get_max_slides()
+    },
+    "presentation_structure": [
+        {"slide_number": 1, "slide_type": "TITLE_SLIDE", "title": "Title",
+         "content_outline": ["Main title", "Subtitle", "Presenter information"]},
+        {"slide_number": 2, "slide_type": "AGENDA_SLIDE", "title": "Agenda",
+         "content_outline": ["Introduction", "Key Insights", "Recommendations", "Conclusion"]},
+        {"slide_number": 3, "slide_type": "INTRODUCTION_SLIDE", "title": "Introduction",
+         "content_outline": ["Background", "Context", "Objectives"]},
+        {"slide_number": 4, "slide_type": "KEY_INSIGHT_SLIDE", "title": "Key Insight #1",
+         "content_outline": ["Main finding", "Supporting evidence", "Implications"]},
+        {"slide_number": 11, "slide_type": "RECOMMENDATIONS_SLIDE", "title": "Recommendations",
+         "content_outline": ["Action item 1", "Action item 2", "Next steps"]},
+        {"slide_number": 12, "slide_type": "THANK_YOU_SLIDE", "title": "Thank You",
+         "content_outline": ["Thank you", "Contact information", "Questions"]}
+    ]
+}
+_OUTPUT_SCHEMA_EXAMPLE = (orjson.dumps(_OUTPUT_SCHEMA).decode("utf-8") if orjson
+                          else json.dumps(_OUTPUT_SCHEMA, separators=(",", ":")))
+
+# System prompt only depends on config.py - built once per worker, byte-identical for every
+# request so the model provider's automatic prompt-prefix cache can reuse it
+_INSTRUCTIONS = f"""
         You are a Presentation Structure Expert that analyzes content and creates optimal slide structures following a standardized business presentation outline.
 
         YOUR RESPONSIBILITIES:
@@ -62,76 +143,17 @@ class PresentationStructureAgent(BaseAgent):
         - Use your best judgment for slide count and structure based on content analysis
 
         OUTPUT FORMAT (JSON only, no markdown):
-        {{
-            "content_analysis": {{
-                "main_topics": ["topic1", "topic2", ...],
-                "content_complexity": "light|medium|heavy",
-                "estimated_duration": "10-15 minutes"
-            }},
-            "slide_planning": {{
-                "optimal_slides": 10,
-                "reasoning": "Based on content analysis: X main topics identified, requiring Y slides for optimal presentation flow and audience engagement",
-                "max_slides_enforced": {get_max_slides()}
-            }},
-            "presentation_structure": [
-                {{
-                    "slide_number": 1,
-                    "slide_type": "TITLE_SLIDE",
-                    "title": "Title",
-                    "content_outline": ["Main title", "Subtitle", "Presenter information"]
-                }},
-                {{
-                    "slide_number": 2,
-                    "slide_type": "AGENDA_SLIDE",
-                    "title": "Agenda",
-                    "content_outline": ["Introduction", "Key Insights", "Recommendations", "Conclusion"]
-                }},
-                {{
-                    "slide_number": 3,
-                    "slide_type": "INTRODUCTION_SLIDE",
-                    "title": "Introduction",
-                    "content_outline": ["Background", "Context", "Objectives"]
-                }},
-                {{
-                    "slide_number": 4,
-                    "slide_type": "KEY_INSIGHT_SLIDE",
-                    "title": "Key Insight #1",
-                    "content_outline": ["Main finding", "Supporting evidence", "Implications"]
-                }},
-                {{
-                    "slide_number": 11,
-                    "slide_type": "RECOMMENDATIONS_SLIDE",
-                    "title": "Recommendations",
-                    "content_outline": ["Action item 1", "Action item 2", "Next steps"]
-                }},
-                {{
-                    "slide_number": 12,
-                    "slide_type": "THANK_YOU_SLIDE",
-                    "title": "Thank You",
-                    "content_outline": ["Thank you", "Contact information", "Questions"]
-                }}
-            ]
-        }}
+        {_OUTPUT_SCHEMA_EXAMPLE}
 
         CRITICAL: Never exceed {get_max_slides()} slides regardless of content volume. Your entire output must be a single, valid JSON object.
         """
 
-        self.agent = ChatCompletionAgent(
-            service=self.service,
-            name=self.__class__.__name__,
-            instructions=instructions
-        )
-
-    async def process(self, extracted_content: str, context_metadata: Optional[Dict[str, Any]] = None) -> str:
-        """Analyze content and create presentation structure"""
-        try:
-            analysis_prompt = f"""
+# Fixed part of the per-request prompt - sent ahead of the document for the same reason
+_ANALYSIS_INSTRUCTIONS = """
             CONTENT ANALYSIS & STRUCTURE CREATION:
             
-            EXTRACTED CONTENT TO ANALYZE: {extracted_content[:12000]}
-            
             CRITICAL REQUIREMENTS:
-            1. **ANALYZE THE ACTUAL CONTENT**: Base your analysis on the specific content provided above
+            1. **ANALYZE THE ACTUAL CONTENT**: Base your analysis on the specific content provided below
             2. **EXTRACT REAL TOPICS**: Identify the actual topics, projects, data, and key points from the content
             3. **CREATE RELEVANT STRUCTURE**: Build slides that directly relate to the content provided
             4. **USE SPECIFIC DETAILS**: Include actual names, dates, numbers, and facts from the content
@@ -151,6 +173,56 @@ class PresentationStructureAgent(BaseAgent):
             - Ensure each slide serves a purpose in presenting the real content
             
             Create a detailed slide-by-slide outline in the specified JSON format based on the ACTUAL content provided.
+            
+"""
+
+class PresentationStructureAgent(BaseAgent):
+    """Analyzes content volume, determines optimal slides, and creates presentation structure"""
+
+    agent_description = "Content analysis, slide count determination, and presentation structure creation"
+    agent_use_cases = [
+        "Content volume analysis",
+        "Optimal slide count determination", 
+        "Slide sequence planning",
+        "Presentation structure creation"
+    ]
+
+    def __init__(self, **kwargs):
+        super().__init__()
+        config = apply_config_overrides(self.__class__.__name__, **kwargs)
+        self.service, self.default_execution_settings = get_ai_service(**config)
+        # Same document only maps to the same structure for the same model and settings
+        self._cache_scope = (self.__class__.__name__, os.getenv("DEPLOYMENT_NAME"), sorted(config.items()))
+        # Slide limits are static config - resolved once instead of on every request
+        self._max_slides = get_max_slides()
+        self._min_slides = PRESENTATION_CONFIG['min_slides']
+
+        self.agent = ChatCompletionAgent(
+            service=self.service,
+            name=self.__class__.__name__,
+            instructions=_INSTRUCTIONS
+        )
+
+    async def process(self, extracted_content: str, context_metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Analyze content and create presentation structure"""
+        try:
+            # Compress before truncating so the 12000-char budget goes to real content
+            content = _compress_content(extracted_content)[:12000]
+
+            # Repeat documents reuse the earlier structure - whitespace-only differences still hit
+            cache_key = _STRUCTURE_CACHE.make_key(
+                self._cache_scope,
+                self._min_slides,
+                self._max_slides,
+                ' '.join(content.split())
+            )
+            cached_structure = _STRUCTURE_CACHE.get(cache_key)
+            if cached_structure is not None:
+                return cached_structure
+
+            # Fixed instructions first and the document last - identical prompt prefix across requests
+            analysis_prompt = f"""{_ANALYSIS_INSTRUCTIONS}
+            EXTRACTED CONTENT TO ANALYZE: {content}
             """
             
             self.add_user_message(analysis_prompt)
@@ -163,61 +235,64 @@ class PresentationStructureAgent(BaseAgent):
             )
 
             # Handle semantic kernel response
-            if hasattr(response, 'message'):
-                # New format: AgentResponseItem with message attribute
-                response_content = str(response.message.content) if hasattr(response.message, 'content') else str(response.message)
-            elif isinstance(response, list) and len(response) > 0:
-                # Old format: list of messages
-                last_message = response[-1]
-                response_content = str(last_message.content) if hasattr(last_message, 'content') else str(last_message)
-            else:
-                response_content = str(response)
+            response_content = self.get_response_text(response)
 
             self.add_assistant_message(response_content)
             
-            return self._validate_and_enforce_limits(response_content, extracted_content)
+            try:
+                structure_json = self._validate_and_enforce_limits(response_content)
+            except (json.JSONDecodeError, Exception) as e:
+                print(f"Structure validation error: {str(e)}")
+                return self._create_fallback_structure(extracted_content)
+            
+            # Only validated AI structures are cached - fallbacks get a fresh attempt next time
+            _STRUCTURE_CACHE.put(cache_key, structure_json)
+            return structure_json
 
         except Exception as e:
             print(f"Structure creation error: {str(e)}")
             return self._create_fallback_structure(extracted_content)
 
-    def _validate_and_enforce_limits(self, ai_response: str, content: str) -> str:
-        """Validate response and enforce slide limits"""
-        try:
-            if ai_response.startswith('```json'):
-                ai_response = ai_response.replace('```json', '').replace('```', '').strip()
-            
-            result = json.loads(ai_response)
-            
-            # Enforce slide count limits
-            slide_planning = result.get("slide_planning", {})
-            optimal_slides = slide_planning.get("optimal_slides", 10)  # Reasonable default if not specified
-            
-            # Apply hard limits
-            max_slides = get_max_slides()
-            min_slides = PRESENTATION_CONFIG['min_slides']
-            
-            if optimal_slides > max_slides:
-                optimal_slides = max_slides
-                slide_planning["reasoning"] += f" | Limited to maximum {max_slides} slides"
-                slide_planning["max_slides_enforced"] = max_slides
-            elif optimal_slides < min_slides:
-                optimal_slides = min_slides
-                slide_planning["reasoning"] += f" | Minimum {min_slides} slides enforced"
-            
-            slide_planning["optimal_slides"] = optimal_slides
-            result["slide_planning"] = slide_planning
-            
-            # Ensure structure matches slide count
-            structure = result.get("presentation_structure", [])
-            if len(structure) != optimal_slides:
-                result["presentation_structure"] = self._adjust_structure_length(structure, optimal_slides)
-            
-            return json.dumps(result, indent=2)
-            
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"Structure validation error: {str(e)}")
-            return self._create_fallback_structure(content)
+    def _validate_and_enforce_limits(self, ai_response: str) -> str:
+        """Validate response and enforce slide limits - raises if the response is not valid JSON"""
+        # Only the ends of the response can carry a code fence - leave any inner backticks alone
+        ai_response = ai_response.strip()
+        if ai_response.startswith('```'):
+            ai_response = ai_response.removeprefix('```json').removeprefix('```').removesuffix('```').strip()
+        
+        result = orjson.loads(ai_response) if orjson else json.loads(ai_response)
+        
+        # Enforce slide count limits
+        slide_planning = result.get("slide_planning", {})
+        optimal_slides = slide_planning.get("optimal_slides", 10)  # Reasonable default if not specified
+        
+        # Apply hard limits
+        max_slides = self._max_slides
+        min_slides = self._min_slides
+        
+        # Common case: the model already honoured the limits - hand its JSON on without re-serializing
+        if ("optimal_slides" in slide_planning and type(optimal_slides) is int
+                and min_slides <= optimal_slides <= max_slides
+                and len(result.get("presentation_structure", [])) == optimal_slides):
+            return ai_response
+        
+        if optimal_slides > max_slides:
+            optimal_slides = max_slides
+            slide_planning["reasoning"] += f" | Limited to maximum {max_slides} slides"
+            slide_planning["max_slides_enforced"] = max_slides
+        elif optimal_slides < min_slides:
+            optimal_slides = min_slides
+            slide_planning["reasoning"] += f" | Minimum {min_slides} slides enforced"
+        
+        slide_planning["optimal_slides"] = optimal_slides
+        result["slide_planning"] = slide_planning
+        
+        # Ensure structure matches slide count
+        structure = result.get("presentation_structure", [])
+        if len(structure) != optimal_slides:
+            result["presentation_structure"] = self._adjust_structure_length(structure, optimal_slides)
+        
+        return _dumps(result)
 
     def _adjust_structure_length(self, structure: list, target_slides: int) -> list:
         """Adjust structure to match target slide count using standard outline"""
@@ -225,32 +300,25 @@ class PresentationStructureAgent(BaseAgent):
             return structure
         
         # Generate structure based on standard outline
-        outline_structure = get_outline_structure(target_slides)
-        
-        adjusted = []
-        for i, outline_item in enumerate(outline_structure):
-            slide_num = i + 1
-            adjusted.append({
+        return self._build_outline_structure(target_slides)
+
+    def _build_outline_structure(self, slide_count: int) -> list:
+        """Placeholder slides following the standard outline, built in one pass"""
+        outline_for_type = self._get_content_outline_for_type
+        return [
+            {
                 "slide_number": slide_num,
-                "slide_type": outline_item["type"],
-                "title": outline_item["title"],
-                "content_outline": self._get_content_outline_for_type(outline_item["type"])
-            })
-        
-        return adjusted
+                "slide_type": slide_type,
+                "title": title,
+                "content_outline": outline_for_type(slide_type)
+            }
+            for slide_num, (slide_type, title) in enumerate(_outline_slots(slide_count), start=1)
+        ]
     
     def _get_content_outline_for_type(self, slide_type: str) -> list:
         """Get appropriate content outline based on slide type"""
-        content_outlines = {
-            "TITLE_SLIDE": ["Main title", "Subtitle", "Presenter information"],
-            "AGENDA_SLIDE": ["Topic 1", "Topic 2", "Topic 3", "Q&A"],
-            "INTRODUCTION_SLIDE": ["Background", "Context", "Objectives"],
-            "KEY_INSIGHT_SLIDE": ["Main finding", "Supporting evidence", "Implications"],
-            "RECOMMENDATIONS_SLIDE": ["Action item 1", "Action item 2", "Next steps"],
-            "CONCLUSION_SLIDE": ["Key takeaways", "Summary of insights", "Final thoughts"],
-            "THANK_YOU_SLIDE": ["Thank you"]
-        }
-        return content_outlines.get(slide_type, ["Key point 1", "Key point 2", "Key point 3"])
+        # Fresh list per slide - callers may edit the outline in place
+        return list(_CONTENT_OUTLINES.get(slide_type, _DEFAULT_CONTENT_OUTLINE))
 
     def _create_fallback_structure(self, content: str) -> str:
         """Create fallback structure using standard outline when AI analysis fails"""
@@ -267,23 +335,12 @@ class PresentationStructureAgent(BaseAgent):
             fallback_slides = 12  # Heavy content
         
         # Ensure within bounds
-        fallback_slides = max(PRESENTATION_CONFIG['min_slides'], 
-                            min(fallback_slides, get_max_slides()))
+        fallback_slides = max(self._min_slides, min(fallback_slides, self._max_slides))
         
         # Use standard outline structure
-        outline_structure = get_outline_structure(fallback_slides)
-        structure = []
-        
-        for i, outline_item in enumerate(outline_structure):
-            slide_num = i + 1
-            structure.append({
-                "slide_number": slide_num,
-                "slide_type": outline_item["type"],
-                "title": outline_item["title"],
-                "content_outline": self._get_content_outline_for_type(outline_item["type"])
-            })
+        structure = self._build_outline_structure(fallback_slides)
         
-        return json.dumps({
+        return _dumps({
             "content_analysis": {
                 "main_topics": main_topics,
                 "content_complexity": "medium",
@@ -292,7 +349,7 @@ class PresentationStructureAgent(BaseAgent):
             "slide_planning": {
                 "optimal_slides": fallback_slides,
                 "reasoning": f"Fallback analysis - {len(main_topics)} topics detected, using {fallback_slides} slides",
-                "max_slides_enforced": get_max_slides()
+                "max_slides_enforced": self._max_slides
             },
             "presentation_structure": structure
-        }, indent=2)
\ No newline at end of file
+        })
\ No newline at end of file
@@ -3,10 +3,15 @@ Slide Content Generator - Creates detailed slide content
 """
 from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.functions import KernelArguments
-from config import get_ai_service, apply_config_overrides
+from config import get_ai_service, apply_config_overrides, RESPONSE_CACHE_CONFIG
 from typing import Dict, Any, Optional
 from agents.core.base_agent import BaseAgent
+from agents.core.response_cache import ResponseCache
 import json
+import os
+
+# Validated slide content for structures seen before - shared by every agent instance in this worker
+_CONTENT_CACHE = ResponseCache(RESPONSE_CACHE_CONFIG["max_entries"], RESPONSE_CACHE_CONFIG["ttl_seconds"])
 
 class SlideContentGenerator(BaseAgent):
     """Generates detailed content for individual slides"""
@@ -23,6 +28,8 @@ class SlideContentGenerator(BaseAgent):
         super().__init__()
         config = apply_config_overrides(self.__class__.__name__, **kwargs)
         self.service, self.default_execution_settings = get_ai_service(**config)
+        # Same structure only maps to the same content for the same model and settings
+        self._cache_scope = (self.__class__.__name__, os.getenv("DEPLOYMENT_NAME"), sorted(config.items()))
 
         instructions = """
         You are a Slide Content Specialist that creates engaging, professional slide content based STRICTLY on the provided document structure and content.
@@ -112,6 +119,13 @@ class SlideContentGenerator(BaseAgent):
                 print("SlideContentGenerator: No slides found in structure")
                 return self._fallback_content_generation(structure)
             
+            # Keyed on the parsed structure, so formatting differences in the incoming JSON still hit
+            slide_list_json = json.dumps(slide_list, indent=2)
+            cache_key = _CONTENT_CACHE.make_key(self._cache_scope, main_topics, slide_list_json)
+            cached_content = _CONTENT_CACHE.get(cache_key)
+            if cached_content is not None:
+                return cached_content
+            
             print(f"SlideContentGenerator: Processing {len(slide_list)} slides based on topics: {main_topics}")
             
             content_prompt = f"""
@@ -122,7 +136,7 @@ class SlideContentGenerator(BaseAgent):
             
             MAIN TOPICS IDENTIFIED: {main_topics}
             
-            PRESENTATION STRUCTURE: {json.dumps(slide_list, indent=2)}
+            PRESENTATION STRUCTURE: {slide_list_json}
             
             CRITICAL INSTRUCTIONS:
             1. **ANALYZE THE STRUCTURE**: Parse the JSON structure to understand each slide's purpose
@@ -175,15 +189,7 @@ class SlideContentGenerator(BaseAgent):
             )
 
             # Handle semantic kernel response
-            if hasattr(response, 'message'):
-                # New format: AgentResponseItem with message attribute
-                response_content = str(response.message.content) if hasattr(response.message, 'content') else str(response.message)
-            elif isinstance(response, list) and len(response) > 0:
-                # Old format: list of messages
-                last_message = response[-1]
-                response_content = str(last_message.content) if hasattr(last_message, 'content') else str(last_message)
-            else:
-                response_content = str(response)
+            response_content = self.get_response_text(response)
 
             # Clean up markdown formatting if present
             if response_content.startswith('```json'):
@@ -195,6 +201,8 @@ class SlideContentGenerator(BaseAgent):
                 if isinstance(parsed_response, list) and len(parsed_response) > 0:
                     print(f"SlideContentGenerator: Successfully generated {len(parsed_response)} slides with AI")
                     self.add_assistant_message(response_content)
+                    # Only validated AI content is cached - fallbacks get a fresh attempt next time
+                    _CONTENT_CACHE.put(cache_key, response_content)
                     return response_content
                 else:
                     print(f"SlideContentGenerator: Invalid AI response format, using fallback")
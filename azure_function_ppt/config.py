@@ -2,6 +2,7 @@
 Configuration module for PowerPoint Generation Service
 """
 import os
+import functools
 from dotenv import load_dotenv
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
@@ -203,6 +204,16 @@ DEFAULT_AGENT_CONFIGS = {
     }
 }
 
+# ====================================================================
+# RESPONSE CACHE
+# ====================================================================
+
+# Validated AI responses are reused for repeat documents - in memory, per Function worker
+RESPONSE_CACHE_CONFIG = {
+    "max_entries": 256,             # Least recently used entries evicted beyond this (0 disables)
+    "ttl_seconds": 24 * 60 * 60     # Entries expire after a day
+}
+
 # ====================================================================
 # SESSION MANAGEMENT
 # ====================================================================
@@ -250,8 +261,9 @@ def get_max_slides() -> int:
     """Get maximum allowed slides"""
     return PRESENTATION_CONFIG["max_slides"]
 
+@functools.lru_cache(maxsize=None)
 def get_template_path(template_type: str = "default") -> str:
-    """Get template file path based on presentation type"""
+    """Get template file path based on presentation type (resolved once per type - config is static)"""
     import os
     
     # Check if templates are enabled
@@ -221,10 +221,13 @@ class PowerPointOrchestrator:
         try:
             print(f"[STEP 5] Building PowerPoint file - Session: {session_id}")
             
-            # Validate input
+            # Validate input - hand the parsed slides to the builder so it doesn't parse them again
+            builder_input = slide_content
             try:
                 parsed_slides = json.loads(slide_content)
                 print(f"[STEP 5] Processing {len(parsed_slides)} slides for PowerPoint generation")
+                if isinstance(parsed_slides, (list, dict)):
+                    builder_input = parsed_slides
             except json.JSONDecodeError:
                 print("[STEP 5] WARNING: Invalid JSON input for PowerPoint builder")
                 
@@ -233,7 +236,7 @@ class PowerPointOrchestrator:
                 raise Exception("PowerPointBuilderAgent not available")
                 
             context_metadata = {"session_id": session_id}
-            ppt_data = await builder_agent.process(slide_content, context_metadata)
+            ppt_data = await builder_agent.process(builder_input, context_metadata)
             
             if isinstance(ppt_data, str):
                 decoded_data = base64.b64decode(ppt_data)
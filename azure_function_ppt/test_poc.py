@@ -7,6 +7,7 @@ Tests the core functionality: Document input → PowerPoint output
 Usage:
   python test_poc.py               # Run essential tests (reduced token usage)
   python test_poc.py --long-only   # Run only the long document test
+  python test_poc.py --local       # Run only the local builder checks (no service, no tokens)
 
 The long document test uses a comprehensive 8,000-word strategic document
 to test content-driven slide optimization and should generate 20-30 slides.
@@ -16,9 +17,16 @@ core functionality validation.
 """
 
 import requests
+import asyncio
+import io
 import json
+import os
+import sys
 import time
 
+# Local checks import the service modules directly
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
 class PowerPointPOCTest:
     """Simple POC testing for the PowerPoint generation service"""
     
@@ -206,6 +214,55 @@ Implementation success depends on maintaining strategic focus while adapting to
         
         return self._make_request_with_details(test_request, "Long Document")
 
+    def _build_local_deck(self, slide_content):
+        """Build a deck with PowerPointBuilderAgent directly and return each slide's paragraph texts"""
+        from pptx import Presentation
+        from agents.powerpoint_builder_agent import PowerPointBuilderAgent
+
+        ppt_bytes = asyncio.run(PowerPointBuilderAgent().process(slide_content))
+        return [
+            [paragraph.text for shape in slide.shapes if shape.has_text_frame
+             for paragraph in shape.text_frame.paragraphs]
+            for slide in Presentation(io.BytesIO(ppt_bytes)).slides
+        ]
+
+    def test_control_characters_in_content(self):
+        """Local: bullets with soft line breaks or control characters are all kept"""
+        print("Testing control characters in slide content...")
+
+        try:
+            slides = [
+                {"title": "Control Characters", "content": ["Intro"], "layout": "TITLE_SLIDE"},
+                {"title": "Bullets", "content": ["line\vwith vt", "bell\x07x", "ok"], "layout": "CONTENT_SLIDE"}
+            ]
+            paragraphs = self._build_local_deck(json.dumps(slides))[1]
+            # \v becomes a soft line break, other control characters are escaped as _xHHHH_
+            expected = ["line\x0bwith vt", "bell_x0007_x", "ok"]
+            if all(text in paragraphs for text in expected):
+                print(f"  SUCCESS: {len(expected)} bullets kept")
+                return True
+            print(f"  FAILED: Expected {expected}, got {paragraphs}")
+            return False
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            return False
+
+    def test_markdown_nbsp_lines(self):
+        """Local: markdown lines that start with non-breaking spaces are kept"""
+        print("Testing markdown lines with leading NBSP...")
+
+        try:
+            markdown = "# NBSP Lines\n\n## Bullets\n\xa0- lead nbsp bullet\n\u2003em space line\n- ok"
+            paragraphs = self._build_local_deck(markdown)[1]
+            expected = ["lead nbsp bullet", "em space line", "ok"]
+            if all(text in paragraphs for text in expected):
+                print(f"  SUCCESS: {len(expected)} lines kept")
+                return True
+            print(f"  FAILED: Expected {expected}, got {paragraphs}")
+            return False
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            return False
 
     def _make_request(self, test_request, test_name):
         """Make API request and validate response"""
@@ -316,7 +373,7 @@ Implementation success depends on maintaining strategic focus while adapting to
         tests = [
             ("User Instructions + Document", self.test_with_user_instruction),
             ("Long Document Handling", self.test_long_document_handling)
-        ]
+        ] + self.local_tests()
         
         results = []
         for test_name, test_func in tests:
@@ -347,6 +404,28 @@ Implementation success depends on maintaining strategic focus while adapting to
         
         return passed == total
 
+    def local_tests(self):
+        """Checks that build decks in-process - no service or tokens needed"""
+        return [
+            ("Control Characters In Content", self.test_control_characters_in_content),
+            ("Markdown NBSP Lines", self.test_markdown_nbsp_lines)
+        ]
+
+    def run_local_tests_only(self):
+        """Run only the local builder checks"""
+        print("=" * 50)
+        print("POWERPOINT BUILDER LOCAL CHECKS")
+        print("=" * 50)
+
+        results = []
+        for test_name, test_func in self.local_tests():
+            print(f"{test_name}:")
+            results.append(test_func())
+            print()
+
+        print(f"Overall: {sum(results)}/{len(results)} local checks passed")
+        return all(results)
+
     def run_long_document_test_only(self):
         """Run only the long document test for focused testing"""
         print("=" * 60)
@@ -380,16 +459,16 @@ Implementation success depends on maintaining strategic focus while adapting to
 
 def main():
     """Run POC tests"""
-    import sys
-    
     tester = PowerPointPOCTest()
     
     # Check if user wants to run specific tests
     if len(sys.argv) > 1:
         if sys.argv[1] == "--long-only":
             success = tester.run_long_document_test_only()
+        elif sys.argv[1] == "--local":
+            success = tester.run_local_tests_only()
         else:
-            print("Usage: python test_poc.py [--long-only]")
+            print("Usage: python test_poc.py [--long-only | --local]")
             success = tester.run_poc_tests()
     else:
         success = tester.run_poc_tests()